@@ -0,0 +1,189 @@
+# -*- coding: utf8 -*-
+"""
+modes
+Paraidomat
+
+Measure wall time, CPU time and SNMP PDUs of every mode of check_checkpoint.
+
+Each mode is checked in this process against the simulated agent in
+simagent.py, so the numbers cover the polling path (requests, decoding and
+evaluation) without interpreter startup, see startup.py for that. The agent
+runs in its own thread; CPU time is measured for the checking thread only.
+Every mode is checked once before measuring, so the setup of the SNMP engine
+isn't counted, and the median of all runs is reported.
+
+The results can be saved as JSON and compared with the results of another
+version, which prints every mode that got slower or sends more PDUs.
+
+Usage: python benchmarks/modes.py [options]
+    -h, --help             show this help
+    --runs <n>             runs per mode (default 10)
+    --rows <n>             rows of the cpu, disk and hardware tables
+    --interfaces <n>       rows of the ifTable (default 4)
+    --virtual-systems <n>  virtual systems of the vsx mode (default 4)
+    --latency <seconds>    delay of every answer of the agent
+    --loss <probability>   share of requests the agent drops
+    --v3                   ask with SNMPv3 authPriv instead of SNMPv2c,
+                           --loss is ignored then
+    --save <file>          write the results as JSON
+    --compare <file>       compare with results saved earlier
+    --tolerance <percent>  allowed slowdown before --compare complains (20)
+"""
+
+import getopt
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import simagent
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+import check_checkpoint
+
+MODE_L = check_checkpoint.MODE_L + ["all"]
+
+
+def measure(gateway_d, mode, runs, stats_d):
+    """ Check one mode runs times and return its medians as a dict.
+
+    Keyword arguments:
+    gateway_d -- the gateway, pointing to the simulated agent
+    mode -- a mode of check_checkpoint or "all"
+    runs -- number of runs
+    stats_d -- PDU counters of the simulated agent
+    """
+
+    mode_l = check_checkpoint.ALL_MODES_L if mode == "all" else [mode]
+    wall_l, cpu_l, pdu_l, varbind_l = [], [], [], []
+    check_checkpoint.check_gateway(dict(gateway_d), mode_l)  # warm up
+    state = 0
+
+    for _ in range(runs):
+        stats_d.clear()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        result_l = check_checkpoint.check_gateway(dict(gateway_d), mode_l)
+        cpu_l.append(time.thread_time() - cpu_start)
+        wall_l.append(time.perf_counter() - wall_start)
+        pdu_l.append(sum(count for key, count in stats_d.items()
+                         if key.endswith("PDU")))
+        varbind_l.append(stats_d.get("varbinds", 0))
+        state = max(result_d["state"] for result_d in result_l)
+
+    return {"wall_ms": statistics.median(wall_l) * 1000,
+            "cpu_ms": statistics.median(cpu_l) * 1000,
+            "pdus": statistics.median(pdu_l),
+            "varbinds": statistics.median(varbind_l),
+            "state": state}
+
+
+def compare(result_d, baseline_d, tolerance):
+    """ Print the modes that got worse than the baseline, return their count.
+
+    Keyword arguments:
+    result_d -- results of this run, mode -> measure() dict
+    baseline_d -- results of an earlier run
+    tolerance -- allowed slowdown in percent
+    """
+
+    regressions = 0
+    for mode, measured_d in result_d.items():
+        if mode not in baseline_d:
+            continue
+        base_d = baseline_d[mode]
+        for key in ("wall_ms", "cpu_ms"):
+            if measured_d[key] > base_d[key] * (1 + tolerance / 100.0):
+                regressions += 1
+                print("%s: %s %.1f -> %.1f" % (mode, key, base_d[key],
+                                               measured_d[key]))
+        for key in ("pdus", "varbinds"):
+            if measured_d[key] > base_d[key]:
+                regressions += 1
+                print("%s: %s %g -> %g" % (mode, key, base_d[key],
+                                           measured_d[key]))
+    return regressions
+
+
+def main(argv):
+    runs = 10
+    table_d = {}
+    agent_d = {"seed": 1}
+    virtual_systems = 4
+    save_path = compare_path = None
+    tolerance = 20
+    v3 = False
+
+    try:
+        opts, args = getopt.getopt(argv, "h", [
+            "runs=", "rows=", "interfaces=", "latency=", "loss=", "save=",
+            "compare=", "tolerance=", "v3", "virtual-systems=", "help"])
+    except getopt.GetoptError as err:
+        print("%s\n%s" % (err, __doc__[__doc__.index("Usage:"):]))
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt in ("-h", "--help"):
+            print(__doc__[__doc__.index("Usage:"):])
+            sys.exit(0)
+        elif opt == "--runs":
+            runs = int(arg)
+        elif opt == "--rows":
+            for key in ("cores", "partitions", "fans", "sensors", "psus"):
+                table_d[key] = int(arg)
+        elif opt == "--interfaces":
+            table_d["interfaces"] = int(arg)
+        elif opt == "--virtual-systems":
+            virtual_systems = int(arg)
+        elif opt in ("--latency", "--loss"):
+            agent_d[opt[2:]] = float(arg)
+        elif opt == "--save":
+            save_path = arg
+        elif opt == "--compare":
+            compare_path = arg
+        elif opt == "--tolerance":
+            tolerance = float(arg)
+        elif opt == "--v3":
+            v3 = True
+
+    if v3:  # serve_v3() doesn't drop requests
+        agent_d = {"v3": True, "latency": agent_d.get("latency", 0.0)}
+    agent_d["virtual_systems_d"] = simagent.build_virtual_systems(
+        virtual_systems, **table_d)
+    port, stop, stats_d = simagent.start(
+        simagent.build_table(virtual_systems=virtual_systems, **table_d),
+        **agent_d)
+    check_checkpoint.STATE_DIR_S = tempfile.mkdtemp()
+    gateway_d = {"host": "simagent", "address": "127.0.0.1", "port": port,
+                 "community": "public", "version": "2c", "cluster": "active"}
+    if v3:
+        gateway_d["version"] = "3"
+        gateway_d["usm"] = dict(check_checkpoint.USM_D,
+                                user=simagent.V3_USER_S,
+                                auth_key=simagent.V3_AUTH_KEY_S,
+                                priv_key=simagent.V3_PRIV_KEY_S)
+
+    result_d = {}
+    print("%-11s %9s %9s %6s %9s %6s" % (
+        "mode", "wall ms", "cpu ms", "pdus", "varbinds", "state"))
+    for mode in MODE_L:
+        result_d[mode] = measure(gateway_d, mode, runs, stats_d)
+        print("%-11s %9.1f %9.1f %6d %9d %6d" % (
+            mode, result_d[mode]["wall_ms"], result_d[mode]["cpu_ms"],
+            result_d[mode]["pdus"],
+            result_d[mode]["varbinds"], result_d[mode]["state"]))
+    stop.set()
+
+    if save_path:
+        with open(save_path, "w") as results:
+            json.dump(result_d, results, indent=2)
+    if compare_path:
+        with open(compare_path) as baseline:
+            if compare(result_d, json.load(baseline), tolerance):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,428 @@
+# -*- coding: utf8 -*-
+"""
+simagent
+Paraidomat
+
+A tiny SNMP v1/v2c responder that serves a synthetic Check Point gateway.
+
+It answers GET, GETNEXT and GETBULK from an in-memory, sorted OID table that
+covers every OID used by check_checkpoint, can inject latency and packet
+loss, and counts the PDUs it receives so benchmarks can report them. The
+virtual systems of a VSX gateway are served from tables of their own, as
+community@<VS ID>.
+
+serve_v3() answers SNMPv3 (authPriv, SHA and AES) from the same table with
+pysnmp's command responder. It counts the reports it sends for engine
+discovery and time synchronization next to the PDUs. Virtual systems are
+the contexts vsid<VS ID> there.
+"""
+
+import bisect
+import random
+import socket
+import threading
+import time
+
+from pyasn1.codec.ber import decoder, encoder
+from pysnmp.proto import api, rfc1902, rfc1905
+
+CP_S = "1.3.6.1.4.1.2620"
+IF_S = "1.3.6.1.2.1.2.2.1"
+V3_USER_S = "monitor"  # the SNMPv3 user of serve_v3() and its pass phrases
+V3_AUTH_KEY_S = "authpass123"
+V3_PRIV_KEY_S = "privpass123"
+V3_ENGINE_ID_S = "80001f8804736d6167656e74"  # fixed, so restarts keep it
+
+
+def _oid(oid_s):
+    return tuple(int(part) for part in oid_s.split("."))
+
+
+def build_table(cores=8, partitions=3, fans=3, sensors=3, psus=2,
+                interfaces=4, ha_state="active", virtual_systems=0,
+                start=None):
+    """ Return a dict mapping OID tuples to callables producing values.
+
+    Keyword arguments:
+    cores -- number of rows in multiProcUsage
+    partitions -- number of disk partitions
+    fans -- number of fan sensors
+    sensors -- number of temperature sensors
+    psus -- number of power supplies
+    interfaces -- number of rows in the IF-MIB ifTable
+    ha_state -- value of haState
+    virtual_systems -- number of rows in the vsxStatusTable, see
+                       build_virtual_systems()
+    start -- reference time for the counters (default now)
+    """
+
+    start = start or time.time()
+    table_d = {}
+
+    def const(value):
+        return lambda: value
+
+    def counter(base, per_second, syntax=rfc1902.Counter32, wrap=2 ** 32):
+        return lambda: syntax(
+            int(base + (time.time() - start) * per_second) % wrap)
+
+    table_d[_oid("1.3.6.1.2.1.1.3.0")] = lambda: rfc1902.TimeTicks(
+        int((time.time() - start) * 100))
+    table_d[_oid(CP_S + ".1.1.4.0")] = counter(1000000, 5000)
+    table_d[_oid(CP_S + ".1.1.6.0")] = counter(1000, 5)
+    table_d[_oid(CP_S + ".1.1.25.3.0")] = const(rfc1902.Gauge32(12345))
+    table_d[_oid(CP_S + ".1.1.25.6.0")] = const(rfc1902.Gauge32(5000))
+    table_d[_oid(CP_S + ".1.1.25.16.0")] = const(rfc1902.Gauge32(5))
+    table_d[_oid(CP_S + ".1.5.5.0")] = const(rfc1902.OctetString("yes"))
+    table_d[_oid(CP_S + ".1.5.6.0")] = const(rfc1902.OctetString(ha_state))
+    table_d[_oid(CP_S + ".1.5.102.0")] = const(rfc1902.OctetString("OK"))
+    table_d[_oid(CP_S + ".1.6.7.2.4.0")] = const(rfc1902.Gauge32(12))
+    for index in range(1, cores + 1):
+        table_d[_oid("%s.1.6.7.5.1.1.%d.0" % (CP_S, index))] = const(
+            rfc1902.Gauge32(index))
+        table_d[_oid("%s.1.6.7.5.1.5.%d.0" % (CP_S, index))] = const(
+            rfc1902.Gauge32(10 + index % 50))
+    table_d[_oid(CP_S + ".1.6.7.4.3.0")] = const(
+        rfc1902.Counter64(16 * 1000 ** 3))
+    table_d[_oid(CP_S + ".1.6.7.4.5.0")] = const(
+        rfc1902.Counter64(10 * 1000 ** 3))
+    for index in range(1, partitions + 1):
+        table_d[_oid("%s.1.6.7.6.1.2.%d.0" % (CP_S, index))] = const(
+            rfc1902.OctetString("/partition%d" % index))
+        table_d[_oid("%s.1.6.7.6.1.8.%d.0" % (CP_S, index))] = const(
+            rfc1902.Integer32(60))
+    for index in range(1, psus + 1):
+        table_d[_oid("%s.1.6.7.9.1.1.1.%d.0" % (CP_S, index))] = const(
+            rfc1902.Integer32(index))
+        table_d[_oid("%s.1.6.7.9.1.1.2.%d.0" % (CP_S, index))] = const(
+            rfc1902.OctetString("Up"))
+    for index in range(1, fans + 1):
+        table_d[_oid("%s.1.6.7.8.2.1.1.%d.0" % (CP_S, index))] = const(
+            rfc1902.Integer32(index))
+        table_d[_oid("%s.1.6.7.8.2.1.2.%d.0" % (CP_S, index))] = const(
+            rfc1902.OctetString("CPU Fan %d" % index))
+        table_d[_oid("%s.1.6.7.8.2.1.3.%d.0" % (CP_S, index))] = const(
+            rfc1902.OctetString("3000"))
+        table_d[_oid("%s.1.6.7.8.2.1.6.%d.0" % (CP_S, index))] = const(
+            rfc1902.Integer32(0))
+    for index in range(1, sensors + 1):
+        table_d[_oid("%s.1.6.7.8.1.1.1.%d.0" % (CP_S, index))] = const(
+            rfc1902.Integer32(index))
+        table_d[_oid("%s.1.6.7.8.1.1.2.%d.0" % (CP_S, index))] = const(
+            rfc1902.OctetString("Temp Sensor %d" % index))
+        table_d[_oid("%s.1.6.7.8.1.1.3.%d.0" % (CP_S, index))] = const(
+            rfc1902.OctetString("%d" % (35 + index)))
+        table_d[_oid("%s.1.6.7.8.1.1.6.%d.0" % (CP_S, index))] = const(
+            rfc1902.Integer32(0))
+    for index in range(1, interfaces + 1):
+        columns_d = {
+            1: const(rfc1902.Integer32(index)),
+            2: const(rfc1902.OctetString("eth%d" % index)),
+            3: const(rfc1902.Integer32(6)),
+            4: const(rfc1902.Integer32(1500)),
+            5: const(rfc1902.Gauge32(1000000000)),
+            6: const(rfc1902.OctetString(b"\x00\x1c\x7f\x00\x00" +
+                                         bytes([index % 256]))),
+            7: const(rfc1902.Integer32(1)),
+            8: const(rfc1902.Integer32(1)),
+            13: counter(0, 0.5),
+            14: counter(0, 0.1),
+            19: counter(0, 0.2),
+            20: counter(0, 0.0),
+            21: const(rfc1902.Gauge32(0)),
+        }
+        for column, value in columns_d.items():
+            table_d[_oid("%s.%d.%d" % (IF_S, column, index))] = value
+    for vsid in range(1, virtual_systems + 1):
+        table_d[_oid("%s.1.16.22.1.1.1.%d" % (CP_S, vsid))] = const(
+            rfc1902.Integer32(vsid))
+        table_d[_oid("%s.1.16.22.1.1.3.%d" % (CP_S, vsid))] = const(
+            rfc1902.OctetString("vs%d" % vsid))
+
+    return table_d
+
+
+def build_virtual_systems(virtual_systems, **kwargs):
+    """ Return a dict mapping VS IDs 1..virtual_systems to their tables.
+
+    Keyword arguments:
+    virtual_systems -- number of virtual systems
+    kwargs -- passed to build_table() for every virtual system
+    """
+
+    return {vsid: build_table(**kwargs)
+            for vsid in range(1, virtual_systems + 1)}
+
+
+def serve(table_d, host="127.0.0.1", port=16100, latency=0.0, loss=0.0,
+          max_varbinds=0, versions=(0, 1), stats_d=None, stop=None,
+          sock=None, seed=None, virtual_systems_d=None):
+    """ Answer SNMP requests from table_d until stop is set.
+
+    Keyword arguments:
+    table_d -- OID table as returned by build_table()
+    host, port -- UDP endpoint to listen on
+    latency -- seconds to wait before each response
+    loss -- probability (0..1) of silently dropping a request
+    max_varbinds -- answer tooBig above this many varbinds (0 = unlimited)
+    versions -- accepted SNMP message versions (0 = v1, 1 = v2c)
+    stats_d -- dict that receives PDU counters per PDU type
+    stop -- threading.Event that ends the loop
+    sock -- already bound UDP socket to use instead of host and port
+    seed -- seed of the packet loss, makes runs with loss repeatable
+    virtual_systems_d -- tables of the virtual systems by VS ID, see
+                         build_virtual_systems()
+    """
+
+    stats_d = stats_d if stats_d is not None else {}
+    stop = stop or threading.Event()
+    context_d = {None: (table_d, sorted(table_d))}
+    for vsid, vs_table_d in (virtual_systems_d or {}).items():
+        context_d[str(vsid)] = (vs_table_d, sorted(vs_table_d))
+    loss_random = random.Random(seed)
+    if sock is None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind((host, port))
+    sock.settimeout(0.2)
+
+    def lookup_next(oid_t):
+        position = bisect.bisect_right(keys_l, oid_t)
+        if position < len(keys_l):
+            return keys_l[position]
+        return None
+
+    def send_later(response, peer):
+        try:
+            sock.sendto(encoder.encode(response), peer)
+        except OSError:  # stopped in the meantime
+            pass
+
+    while not stop.is_set():
+        try:
+            data, peer = sock.recvfrom(65535)
+        except socket.timeout:
+            continue
+        try:
+            version = int(api.decodeMessageVersion(data))
+        except Exception:
+            continue
+        if version not in versions:
+            continue
+        p_mod = api.protoModules[version]
+        request, rest = decoder.decode(data, asn1Spec=p_mod.Message())
+        request_pdu = p_mod.apiMessage.getPDU(request)
+        response = p_mod.apiMessage.getResponse(request)
+        response_pdu = p_mod.apiMessage.getPDU(response)
+        request_vb_l = p_mod.apiPDU.getVarBinds(request_pdu)
+        community_s = str(p_mod.apiMessage.getCommunity(request))
+        vsid = community_s.rpartition("@")[2] if "@" in community_s else None
+        if vsid not in context_d:
+            continue  # unknown community, real agents don't answer either
+        table_d, keys_l = context_d[vsid]
+        pdu_type = request_pdu.__class__.__name__
+        stats_d[pdu_type] = stats_d.get(pdu_type, 0) + 1
+        stats_d["varbinds"] = stats_d.get("varbinds", 0) + len(request_vb_l)
+
+        if loss and loss_random.random() < loss:
+            stats_d["dropped"] = stats_d.get("dropped", 0) + 1
+            continue
+
+        response_vb_l = []
+        error_index = 0
+        if max_varbinds and len(request_vb_l) > max_varbinds:
+            p_mod.apiPDU.setErrorStatus(response_pdu, 1)  # tooBig
+        elif request_pdu.isSameTypeWith(p_mod.GetRequestPDU()):
+            for position, (name, _) in enumerate(request_vb_l, 1):
+                oid_t = tuple(name)
+                if oid_t in table_d:
+                    response_vb_l.append((name, table_d[oid_t]()))
+                elif version == 0:
+                    error_index = error_index or position
+                    response_vb_l.append((name, rfc1902.Null("")))
+                else:
+                    response_vb_l.append((name, rfc1905.noSuchInstance))
+        elif request_pdu.isSameTypeWith(p_mod.GetNextRequestPDU()):
+            for position, (name, _) in enumerate(request_vb_l, 1):
+                oid_t = lookup_next(tuple(name))
+                if oid_t is not None:
+                    response_vb_l.append((oid_t, table_d[oid_t]()))
+                elif version == 0:
+                    error_index = error_index or position
+                    response_vb_l.append((name, rfc1902.Null("")))
+                else:
+                    response_vb_l.append((name, rfc1905.endOfMibView))
+        elif version == 1 and request_pdu.isSameTypeWith(
+                p_mod.GetBulkRequestPDU()):
+            non_repeaters = int(p_mod.apiBulkPDU.getNonRepeaters(request_pdu))
+            repetitions = int(p_mod.apiBulkPDU.getMaxRepetitions(request_pdu))
+            for name, _ in request_vb_l[:non_repeaters]:
+                oid_t = lookup_next(tuple(name))
+                if oid_t is None:
+                    response_vb_l.append((name, rfc1905.endOfMibView))
+                else:
+                    response_vb_l.append((oid_t, table_d[oid_t]()))
+            cursor_l = [tuple(name) for name, _ in
+                        request_vb_l[non_repeaters:]]
+            for _ in range(repetitions):
+                if not cursor_l:
+                    break
+                for column, oid_t in enumerate(cursor_l):
+                    next_t = lookup_next(oid_t) if oid_t else None
+                    if next_t is None:
+                        response_vb_l.append(
+                            (oid_t or (0, 0), rfc1905.endOfMibView))
+                        cursor_l[column] = None
+                    else:
+                        response_vb_l.append((next_t, table_d[next_t]()))
+                        cursor_l[column] = next_t
+                if all(oid_t is None for oid_t in cursor_l):
+                    break
+        if max_varbinds and len(response_vb_l) > max_varbinds:
+            p_mod.apiPDU.setErrorStatus(response_pdu, 1)  # tooBig
+            response_vb_l = request_vb_l
+        elif error_index:
+            p_mod.apiPDU.setErrorStatus(response_pdu, 2)  # noSuchName
+            p_mod.apiPDU.setErrorIndex(response_pdu, error_index)
+            response_vb_l = request_vb_l
+        if version == 0:  # SNMPv1 can't carry Counter64
+            response_vb_l = [
+                (name, rfc1902.Counter32(int(value) % 2 ** 32)
+                 if isinstance(value, rfc1902.Counter64) else value)
+                for name, value in response_vb_l]
+        p_mod.apiPDU.setVarBinds(response_pdu, response_vb_l)
+        if latency:  # like a network, requests in flight don't queue
+            timer = threading.Timer(latency, send_later, (response, peer))
+            timer.daemon = True
+            timer.start()
+        else:
+            sock.sendto(encoder.encode(response), peer)
+
+    sock.close()
+
+
+class TableInstrumentation(object):
+    """ Lets pysnmp's command responders read from a table_d.
+
+    Stands in for the MibInstrumController of an SNMP context. Access
+    control isn't checked, the user of serve_v3() may read everything.
+    """
+
+    def __init__(self, table_d):
+        self.table_d = table_d
+        self.keys_l = sorted(table_d)
+
+    def readVars(self, var_bind_l, ac_info=(None, None)):
+        return [(name, self.table_d[tuple(name)]()
+                 if tuple(name) in self.table_d else rfc1905.noSuchInstance)
+                for name, _ in var_bind_l]
+
+    def readNextVars(self, var_bind_l, ac_info=(None, None)):
+        response_vb_l = []
+        for name, _ in var_bind_l:
+            position = bisect.bisect_right(self.keys_l, tuple(name))
+            if position < len(self.keys_l):
+                oid_t = self.keys_l[position]
+                response_vb_l.append((oid_t, self.table_d[oid_t]()))
+            else:
+                response_vb_l.append((name, rfc1905.endOfMibView))
+        return response_vb_l
+
+
+def serve_v3(table_d, host="127.0.0.1", port=16100, latency=0.0,
+             stats_d=None, stop=None, sock=None, engine_id=V3_ENGINE_ID_S,
+             virtual_systems_d=None):
+    """ Answer SNMPv3 requests from table_d until stop is set.
+
+    V3_USER_S is the only user, with HMAC-SHA authentication and AES-128
+    privacy. Besides the PDUs, stats_d counts the reports sent to managers
+    that don't know the engine ID or time of the agent yet.
+
+    Keyword arguments:
+    table_d -- OID table as returned by build_table()
+    host, port -- UDP endpoint to listen on
+    latency -- seconds to wait before each response
+    stats_d -- dict that receives PDU counters per PDU type
+    stop -- threading.Event that ends the loop
+    sock -- already bound UDP socket to use instead of host and port
+    engine_id -- snmpEngineID of the agent as hex string
+    virtual_systems_d -- tables of the virtual systems by VS ID, see
+                         build_virtual_systems()
+    """
+
+    from pysnmp.carrier.asyncore.dgram import udp
+    from pysnmp.entity import config, engine
+    from pysnmp.entity.rfc3413 import cmdrsp, context
+
+    stats_d = stats_d if stats_d is not None else {}
+    stop = stop or threading.Event()
+    snmp_engine = engine.SnmpEngine(
+        snmpEngineID=rfc1902.OctetString(hexValue=engine_id))
+    if sock is None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind((host, port))
+    config.addTransport(snmp_engine, udp.domainName,
+                        udp.UdpTransport(sock=sock))
+    config.addV3User(snmp_engine, V3_USER_S,
+                     config.usmHMACSHAAuthProtocol, V3_AUTH_KEY_S,
+                     config.usmAesCfb128Protocol, V3_PRIV_KEY_S)
+
+    snmp_context = context.SnmpContext(snmp_engine)
+    snmp_context.unregisterContextName("")
+    snmp_context.registerContextName("", TableInstrumentation(table_d))
+    for vsid, vs_table_d in (virtual_systems_d or {}).items():
+        snmp_context.registerContextName("vsid%s" % vsid,
+                                         TableInstrumentation(vs_table_d))
+    for responder in (cmdrsp.GetCommandResponder,
+                      cmdrsp.NextCommandResponder,
+                      cmdrsp.BulkCommandResponder):
+        responder(snmp_engine, snmp_context).maxVarBinds = 2 ** 16
+
+    def observe(snmp_engine, execution_point, variables, context):
+        if execution_point == "rfc3412.receiveMessage:request":
+            pdu = variables["pdu"]
+            pdu_type = pdu.__class__.__name__
+            stats_d[pdu_type] = stats_d.get(pdu_type, 0) + 1
+            stats_d["varbinds"] = stats_d.get("varbinds", 0) + len(
+                pdu.getComponentByPosition(3))
+            if latency:
+                time.sleep(latency)
+        else:  # unknown engine ID, not in time window, ...
+            stats_d["reports"] = stats_d.get("reports", 0) + 1
+
+    snmp_engine.observer.registerObserver(
+        observe, "rfc3412.receiveMessage:request",
+        "rfc3412.prepareDataElements:sm-failure")
+
+    dispatcher = snmp_engine.transportDispatcher
+    dispatcher.registerTimerCbFun(
+        lambda now: stop.is_set() and dispatcher.jobsArePending() and
+        dispatcher.jobFinished(1))
+    dispatcher.jobStarted(1)
+    try:
+        dispatcher.runDispatcher()
+    finally:
+        dispatcher.closeDispatcher()
+
+
+def start(table_d=None, host="127.0.0.1", port=0, v3=False, **kwargs):
+    """ Start serve() in a daemon thread, or serve_v3() if v3 is True.
+
+    With the default port of 0 the operating system picks a free port.
+    Returns (port, stop, stats_d); set stop to end the agent.
+    """
+
+    stop = threading.Event()
+    stats_d = {}
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, port))
+    thread = threading.Thread(
+        target=serve_v3 if v3 else serve, args=(table_d or build_table(),),
+        kwargs=dict(kwargs, stop=stop, stats_d=stats_d, sock=sock),
+        daemon=True)
+    thread.start()
+    return sock.getsockname()[1], stop, stats_d
+
+
+if __name__ == "__main__":
+    import sys
+    serve(build_table(), port=int(sys.argv[1]) if len(sys.argv) > 1 else 16100)
@@ -0,0 +1,70 @@
+# -*- coding: utf8 -*-
+"""
+startup
+Paraidomat
+
+Measure how long check_checkpoint takes from process start to exit.
+
+Nagios starts one process per check, so interpreter and import time is paid
+on every single check. This runs the plugin as a subprocess for "-h", every
+mode and "all" against the simulated agent in simagent.py and prints min,
+median and max wall time per invocation, next to a bare interpreter as
+baseline.
+
+Usage: python benchmarks/startup.py [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import simagent
+
+PLUGIN_S = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        os.pardir, "check_checkpoint.py")
+MODE_L = ["cpu", "memory", "disk", "hardware", "network", "cluster", "all"]
+
+
+def measure(command_l, runs):
+    """ Run command_l runs times and return the wall times in seconds.
+
+    Keyword arguments:
+    command_l -- command line as list
+    runs -- number of runs
+    """
+
+    times_l = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command_l, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        times_l.append(time.perf_counter() - start)
+    return times_l
+
+
+def report(label, times_l):
+    """ Print one line with min, median and max of times_l in ms. """
+
+    print("%-12s %8.1f %8.1f %8.1f" % (
+        label, min(times_l) * 1000, statistics.median(times_l) * 1000,
+        max(times_l) * 1000))
+
+
+def main(argv):
+    runs = int(argv[0]) if argv else 10
+    port, stop, _ = simagent.start()
+
+    print("%-12s %8s %8s %8s" % ("command", "min ms", "median", "max"))
+    report("python", measure([sys.executable, "-c", "pass"], runs))
+    report("-h", measure([sys.executable, PLUGIN_S, "-h"], runs))
+    for mode in MODE_L:
+        report(mode, measure([sys.executable, PLUGIN_S, "-i", "127.0.0.1",
+                              "-p", str(port), "-c", "public", "-m", mode,
+                              "-s", "active"], runs))
+    stop.set()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,119 @@
+# -*- coding: utf8 -*-
+"""
+test_check_checkpoint
+Paraidomat
+
+Regression tests of parsing addresses, remembering the capabilities of a
+gateway and evaluating the fetched values, and of one check against the
+simulated agent.
+Run them with "python -m pytest tests".
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..",
+                                "benchmarks"))
+
+import check_checkpoint  # noqa: E402
+import simagent  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(check_checkpoint, "STATE_DIR_S",
+                        str(tmp_path / "state"))
+    return tmp_path / "state"
+
+
+@pytest.mark.parametrize("text, address, port", [
+    ("192.0.2.1", "192.0.2.1", 161),
+    ("192.0.2.1:1161", "192.0.2.1", 1161),
+    ("::1", "::1", 161),
+    ("2001:db8::1", "2001:db8::1", 161),
+    ("[2001:db8::1]", "2001:db8::1", 161),
+    ("[2001:db8::1]:1161", "2001:db8::1", 1161)])
+def test_split_address(text, address, port):
+    assert check_checkpoint.split_address(text, 161) == (address, port)
+
+
+@pytest.mark.parametrize("text", [
+    "", "gateway.example.com", "192.0.2.1:", "192.0.2.1:snmp",
+    "192.0.2.1:70000", "[2001:db8::1]:", "[gateway]:161"])
+def test_split_address_invalid(text):
+    with pytest.raises(ValueError):
+        check_checkpoint.split_address(text, 161)
+
+
+def test_capabilities_missing_twice(monkeypatch):
+    scalar_s, table_s = "1.3.6.1.4.1.2620.1.6.7.2.4", "1.3.6.1.4.1.2620.1.6"
+    answer_l = [{}, {scalar_s: 1}, {}, {}, {}, {}]
+    request_l = []
+
+    def snmp_get_scalars(gateway_d, oid_l):
+        request_l.append("get")
+        return answer_l.pop(0)
+
+    def snmp_get(gateway_d, *oid_l, max_repetitions=None):
+        request_l.append("walk")
+        return []
+
+    monkeypatch.setattr(check_checkpoint, "snmp_get_scalars",
+                        snmp_get_scalars)
+    monkeypatch.setattr(check_checkpoint, "snmp_get", snmp_get)
+    gateway_d = {"address": "192.0.2.1", "port": 161}
+
+    # one empty answer in between doesn't count
+    for expected_l in (["get", "walk"], ["get", "walk"], ["get"], ["get"],
+                       []):
+        del request_l[:]
+        values_d = check_checkpoint.fetch_oids(gateway_d, [scalar_s],
+                                               [table_s])
+        assert request_l == expected_l
+    assert values_d == {scalar_s: None, table_s: []}
+
+
+def test_evaluate_hardware_without_components():
+    hardware_d = check_checkpoint.CHECKPOINT_MIB_D["Hardware"]
+    oid_l = check_checkpoint.MODE_OIDS_D["hardware"]["tables"]
+    result_d = check_checkpoint.evaluate_hardware(
+        {oid_s: [] for oid_s in oid_l}, {})
+    assert result_d["state"] == 3
+
+    values_d = {oid_s: [] for oid_s in oid_l}
+    values_d[hardware_d["PSU"]["powerSupplyInfoStatus"]["oid"]] = [
+        ("1", "Up")]
+    assert check_checkpoint.evaluate_hardware(values_d, {})["state"] == 0
+
+
+def test_check_gateway():
+    port, stop, stats_d = simagent.start(simagent.build_table())
+    try:
+        gateway_d = {"host": "simagent", "address": "127.0.0.1",
+                     "port": port, "community": "public", "version": "2c",
+                     "cluster": "", "timeout": 1, "retries": 1}
+        result_l = check_checkpoint.check_gateway(
+            gateway_d, ["cpu", "memory", "network"])
+    finally:
+        stop.set()
+    assert [result_d["mode"] for result_d in result_l] == [
+        "cpu", "memory", "network"]
+    assert all(result_d["state"] != 3 for result_d in result_l), result_l
+
+
+@pytest.mark.parametrize("mode, summary", [
+    ("cpu", "procUsage not available"),
+    ("memory", "TotalReal64, FreeReal64 not available"),
+    ("network", "fwNumConn not available"),
+    ("cluster", "haState not available")])
+def test_evaluate_unavailable(mode, summary):
+    values_d = dict.fromkeys(check_checkpoint.MODE_OIDS_D[mode]["scalars"])
+    values_d.update(dict.fromkeys(
+        check_checkpoint.MODE_OIDS_D[mode]["tables"], []))
+    values_d["rates"] = {}
+    evaluate = getattr(check_checkpoint, "evaluate_%s" % mode)
+    assert evaluate(values_d, {"cluster": "active"}) == \
+        check_checkpoint.check_result(3, summary)
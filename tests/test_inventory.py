@@ -0,0 +1,52 @@
+# -*- coding: utf8 -*-
+"""
+test_inventory
+Paraidomat
+
+Tests of reading the inventory file of the --daemon and --inventory modes.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import check_checkpoint  # noqa: E402
+
+
+def test_read_inventory(tmp_path):
+    inventory = tmp_path / "inventory"
+    inventory.write_text(
+        "# host address community modes cluster\n"
+        "\n"
+        "fw1 192.0.2.1 public\n"
+        "fw2 192.0.2.2:1161 private cpu,memory active\n"
+        "fw3 2001:db8::3 public all\n"
+        "fw4 [2001:db8::4]:1161 public network\n")
+
+    inventory_l = check_checkpoint.read_inventory(str(inventory))
+    assert [(gateway_d["host"], gateway_d["address"], gateway_d["port"])
+            for gateway_d in inventory_l] == [
+        ("fw1", "192.0.2.1", 161), ("fw2", "192.0.2.2", 1161),
+        ("fw3", "2001:db8::3", 161), ("fw4", "2001:db8::4", 1161)]
+    assert inventory_l[0]["modes"] == check_checkpoint.ALL_MODES_L
+    assert inventory_l[1]["modes"] == ["cpu", "memory"]
+    assert inventory_l[1]["community"] == "private"
+    assert inventory_l[1]["cluster"] == "active"
+
+
+@pytest.mark.parametrize("line", [
+    "fw1 192.0.2.1",
+    "fw1 gateway.example.com public",
+    "fw1 192.0.2.1:snmp public",
+    "fw1 192.0.2.1 public cpu,coffee"])
+def test_read_inventory_invalid(tmp_path, capsys, line):
+    inventory = tmp_path / "inventory"
+    inventory.write_text("%s\n" % line)
+
+    with pytest.raises(SystemExit) as exit_info:
+        check_checkpoint.read_inventory(str(inventory))
+    assert exit_info.value.code == 3
+    assert capsys.readouterr().out.startswith("%s:1: " % inventory)
@@ -0,0 +1,62 @@
+# -*- coding: utf8 -*-
+"""
+test_rates
+Paraidomat
+
+Tests of turning the packet counters into rates per second, with counter
+wraps and agent restarts.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import check_checkpoint  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(check_checkpoint, "STATE_DIR_S",
+                        str(tmp_path / "state"))
+    return tmp_path / "state"
+
+
+def test_counter_rate():
+    assert check_checkpoint.counter_rate([0, 100], [10, 600]) == 50.0
+    assert check_checkpoint.counter_rate(None, [10, 600]) is None
+    assert check_checkpoint.counter_rate([0, None], [10, 600]) is None
+    assert check_checkpoint.counter_rate([10, 100], [10, 600]) is None
+
+
+def test_counter_rate_wrap():
+    assert check_checkpoint.counter_rate([0, 2 ** 32 - 100], [10, 900]) \
+        == 100.0
+    assert check_checkpoint.counter_rate([0, 2 ** 64 - 100], [10, 900],
+                                         bits=64) == 100.0
+
+
+def test_counter_rate_reset():
+    # a wrap would mean more than half the range in one interval
+    assert check_checkpoint.counter_rate([0, 1000], [10, 0]) is None
+    assert check_checkpoint.counter_rate([0, 1000], [10, 0], bits=64) \
+        is None
+
+
+def test_counter_rates_restart():
+    oid_s = check_checkpoint.CHECKPOINT_MIB_D["Network"]["fwAccepted"]["oid"]
+    gateway_d = {"address": "192.0.2.1", "port": 161}
+    up_time_s = check_checkpoint.SYS_UP_TIME_S
+
+    rates_d = check_checkpoint.counter_rates(
+        gateway_d, {up_time_s: 5000, oid_s: 1000}, ["network"], now=100)
+    assert rates_d[oid_s] is None
+    rates_d = check_checkpoint.counter_rates(
+        gateway_d, {up_time_s: 6000, oid_s: 2000}, ["network"], now=110)
+    assert rates_d[oid_s] == 100.0
+    # sysUpTime went down: the agent restarted, the old sample is useless
+    rates_d = check_checkpoint.counter_rates(
+        gateway_d, {up_time_s: 100, oid_s: 3000}, ["network"], now=120)
+    assert rates_d[oid_s] is None
@@ -0,0 +1,41 @@
+# -*- coding: utf8 -*-
+"""
+test_trend
+Paraidomat
+
+Tests of projecting when a threshold will be reached with --trend.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import check_checkpoint  # noqa: E402
+
+
+def test_project_trend():
+    time_l = [0, 3600, 7200, 10800, 14400]
+    average, seconds = check_checkpoint.project_trend(
+        time_l, [50, 55, 60, 65, 70], 90)
+    assert average == 60
+    assert seconds == pytest.approx(4 * 3600)
+
+
+def test_project_trend_ring_buffer():
+    # the ring buffer of update_trend() wraps, the order doesn't matter
+    average, seconds = check_checkpoint.project_trend(
+        [10800, 14400, 0, 3600, 7200], [65, 70, 50, 55, 60], 90)
+    assert seconds == pytest.approx(4 * 3600)
+
+
+def test_project_trend_no_projection():
+    assert check_checkpoint.project_trend([], [], 90) == (None, None)
+    assert check_checkpoint.project_trend([0, 60], [50, 60], 90) \
+        == (55, None)  # too few samples
+    assert check_checkpoint.project_trend(
+        [0, 60, 120, 180, 240], [70, 65, None, 60, 55], 90)[1] is None
+    assert check_checkpoint.project_trend(
+        [0, 0, 0, 0, 0], [50, 55, 60, 65, 70], 90)[1] is None